@@ -1,24 +1,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import Sequence
 import bpy
-import gpu
-from gpu_extras.batch import batch_for_shader
+from bpy.app.handlers import persistent
 from bpy.utils import register_classes_factory
+from .border_common import draw_border, free_resources, init_resources
 
 draw_handle = None
-
-
-def shader_gamma_correction(color: Sequence[float]) -> list[float]:
-    """
-    Gamma-corrects a color from Blender prefs for sRGB shader output.
-    """
-    fixed_color = []
-    for i in range(3):  # R, G, B
-        corrected = pow(color[i], 1.0 / 2.2)
-        fixed_color.append(corrected)
-    fixed_color.append(color[3])  # A stays the same
-    return fixed_color
+_msgbus_owner = object()
 
 
 def _in_local_view() -> bool:
@@ -38,49 +26,81 @@ def draw_callback_px() -> None:
         return
 
     preferences = bpy.context.preferences.addons[__package__].preferences
-    color = shader_gamma_correction(preferences.border_color)
     thickness = preferences.border_width + 1  # viewport 'eats' 1px away
 
-    region_width = bpy.context.region.width
-    region_height = bpy.context.region.height
+    draw_border(preferences.border_color, thickness, bpy.context.region)
 
-    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-    gpu.state.blend_set('ALPHA')
 
-    def draw_rect(x1, y1, x2, y2):
-        coords = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
-        batch = batch_for_shader(shader, 'TRI_FAN', {"pos": coords})
-        shader.uniform_float("color", color)
-        batch.draw(shader)
+def _any_local_view() -> bool:
+    """Returns True if any open 3D viewport is in Local View."""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D' and area.spaces.active.local_view is not None:
+                return True
+    return False
 
-    # Top border
-    draw_rect(
-        0,
-        region_height - thickness,
-        region_width,
-        region_height
-    )
-    # Bottom border
-    draw_rect(
-        0, 0,
-        region_width,
-        thickness
-    )
-    # Left border
-    draw_rect(
-        0,
-        thickness,
-        thickness,
-        region_height - thickness
-    )
-    # Right border
-    draw_rect(
-        region_width - thickness,
-        thickness, region_width,
-        region_height - thickness
-    )
 
-    gpu.state.blend_set('NONE')
+def _tag_view3d_redraw() -> None:
+    """Tags all 3D viewports for redraw."""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _sync_draw_handler() -> None:
+    """
+    Installs the draw handler only while some 3D viewport is in Local View,
+    so viewports pay no per-redraw cost the rest of the time.
+    """
+    global draw_handle
+
+    if _any_local_view():
+        if draw_handle is None:
+            draw_handle = bpy.types.SpaceView3D.draw_handler_add(
+                draw_callback_px,
+                (),
+                'WINDOW',
+                'POST_PIXEL'
+            )
+            _tag_view3d_redraw()
+    elif draw_handle is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(draw_handle, 'WINDOW')
+        draw_handle = None
+        _tag_view3d_redraw()
+
+
+def subscribe_to_screen_changes() -> None:
+    """
+    Switching workspace or screen can show a viewport that is already in
+    Local View without any depsgraph update, so check again then.
+    """
+    for key in (
+        (bpy.types.Window, "workspace"),
+        (bpy.types.Window, "screen"),
+    ):
+        bpy.msgbus.subscribe_rna(
+            key=key,
+            owner=_msgbus_owner,
+            args=(),
+            notify=_sync_draw_handler,
+        )
+
+
+@persistent
+def depsgraph_update_handler(scene, depsgraph) -> None:
+    """Toggling Local View tags a depsgraph update, check for it here."""
+    # The localview operator tags objects, skip the scan for anything else
+    if not depsgraph.id_type_updated('OBJECT'):
+        return
+    _sync_draw_handler()
+
+
+@persistent
+def load_post_handler(dummy) -> None:
+    """Resubscribe (msgbus is cleared on load) and check the new file."""
+    subscribe_to_screen_changes()
+    _sync_draw_handler()
 
 
 class LocalviewHighlightPreferences(bpy.types.AddonPreferences):
@@ -120,30 +140,34 @@ register_classes, unregister_classes = register_classes_factory(Classes)
 
 
 def register() -> None:
-    """Register classes and add draw handler."""
-    global draw_handle
-
+    """Register classes and handlers watching for Local View."""
     register_classes()
 
     if bpy.app.background:
         return  # don't register in background mode
 
-    if draw_handle is None:
-        draw_handle = bpy.types.SpaceView3D.draw_handler_add(
-            draw_callback_px,
-            (),
-            'WINDOW',
-            'POST_PIXEL'
-        )
+    init_resources()
+
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_handler)
+    bpy.app.handlers.load_post.append(load_post_handler)
+    subscribe_to_screen_changes()
+    _sync_draw_handler()
 
 
 def unregister() -> None:
-    """Remove draw handler and unregister classes."""
+    """Remove handlers and unregister classes."""
     global draw_handle
 
+    if depsgraph_update_handler in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_handler)
+    if load_post_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(load_post_handler)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+
     if draw_handle is not None:
         bpy.types.SpaceView3D.draw_handler_remove(draw_handle, 'WINDOW')
         draw_handle = None
+    free_resources()
 
     unregister_classes()
 
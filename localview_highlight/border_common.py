@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Viewport border drawing, with the GPU resources it needs.
+"""
+
+from typing import Sequence
+import bpy
+import gpu
+from gpu_extras.batch import batch_for_shader
+
+_shader = None
+_unit_quad_batch = None
+
+
+def _create_border_shader() -> gpu.types.GPUShader:
+    """
+    Creates a flat color shader that gamma-corrects the color uniform for
+    sRGB output, so the raw color from Blender prefs can be passed as is.
+    """
+    shader_info = gpu.types.GPUShaderCreateInfo()
+    shader_info.push_constant('MAT4', "viewProjectionMatrix")
+    shader_info.push_constant('VEC2', "offset")
+    shader_info.push_constant('VEC2', "size")
+    shader_info.push_constant('VEC4', "color")
+    shader_info.vertex_in(0, 'VEC2', "pos")
+    shader_info.fragment_out(0, 'VEC4', "fragColor")
+    shader_info.vertex_source(
+        "void main()"
+        "{"
+        "  gl_Position = viewProjectionMatrix"
+        "    * vec4(pos * size + offset, 0.0, 1.0);"
+        "}"
+    )
+    shader_info.fragment_source(
+        "void main()"
+        "{"
+        "  fragColor = vec4(pow(color.rgb, vec3(1.0 / 2.2)), color.a);"
+        "}"
+    )
+    return gpu.shader.create_from_info(shader_info)
+
+
+def _create_unit_quad_batch(shader: gpu.types.GPUShader) -> gpu.types.GPUBatch:
+    """
+    Creates a unit quad batch, uploaded once and placed on screen by the
+    shader's offset and size uniforms.
+    """
+    coords = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    indices = [(0, 1, 2), (0, 2, 3)]
+    return batch_for_shader(shader, 'TRIS', {"pos": coords}, indices=indices)
+
+
+def init_resources() -> None:
+    """Creates the border shader and unit quad batch, once."""
+    global _shader, _unit_quad_batch
+
+    if _shader is None:
+        _shader = _create_border_shader()
+        _unit_quad_batch = _create_unit_quad_batch(_shader)
+
+
+def free_resources() -> None:
+    """Releases the border shader and unit quad batch."""
+    global _shader, _unit_quad_batch
+
+    _shader = None
+    _unit_quad_batch = None
+
+
+def draw_border(
+    color: Sequence[float], thickness: int, region: bpy.types.Region
+) -> None:
+    """Draws a border of `thickness` pixels along the edges of `region`."""
+    region_width = region.width
+    region_height = region.height
+
+    # Region too small to fit the border (e.g. while being resized or split)
+    if region_width < 2 * thickness or region_height < 2 * thickness:
+        return
+
+    shader = _shader
+    gpu.state.blend_set('ALPHA')
+    shader.bind()
+    shader.uniform_float(
+        "viewProjectionMatrix",
+        gpu.matrix.get_projection_matrix() @ gpu.matrix.get_model_view_matrix()
+    )
+    shader.uniform_float("color", color)
+
+    # Each edge is the unit quad moved and scaled as (x, y, width, height)
+    for x, y, w, h in (
+        # Top border
+        (0, region_height - thickness, region_width, thickness),
+        # Bottom border
+        (0, 0, region_width, thickness),
+        # Left border
+        (0, thickness, thickness, region_height - 2 * thickness),
+        # Right border
+        (region_width - thickness, thickness,
+         thickness, region_height - 2 * thickness),
+    ):
+        shader.uniform_float("offset", (x, y))
+        shader.uniform_float("size", (w, h))
+        _unit_quad_batch.draw(shader)
+
+    gpu.state.blend_set('NONE')
@@ -26,9 +26,11 @@ import argparse
 import os
 import glob
 import re
+import shlex
 import shutil
 import subprocess
 import tomllib
+from pathlib import Path
 from colors import printcol
 
 
@@ -61,6 +63,11 @@ def release_toml_parser():
 
 EXTENSION_FOLDER, PATH_TO_BLENDER = release_toml_parser()
 
+# Patterns used to read and patch the manifest and release file names
+_TOML_VER_RE = re.compile(r'^version\s*=\s*"(\d+)\.(\d+)\.(\d+)"', re.MULTILINE)
+_ZIP_VER_RE = re.compile(rf"extension_{EXTENSION_FOLDER}_v(\d+)-(\d+)-(\d+)\.zip")
+_DEV_RE = re.compile(r'^((?:name|id)\s*=\s*)"([^"]+)"', re.MULTILINE)
+
 
 def check_blender_and_extension_paths(base_path: str | os.PathLike) -> bool:
     """
@@ -85,22 +92,18 @@ def check_blender_and_extension_paths(base_path: str | os.PathLike) -> bool:
     return result
 
 
-def devify_extension_name(dev_path: str | os.PathLike) -> None:
+def devify_copy(src: str | os.PathLike, dst: str | os.PathLike) -> str | os.PathLike:
     """
-    Set the addon name with '_dev' suffix in toml file
+    Copy function for `shutil.copytree` setting the addon name and id with
+    '_dev' suffix while copying the toml file. Other files are copied as is.
     """
 
-    toml_path = os.path.join(dev_path, "blender_manifest.toml")
-    with open(toml_path, "r", encoding="utf-8") as file:
-        content = file.read()
-    content = re.sub(
-        r'^(name\s*=\s*)"([^"]+)"', r'\1"\2_dev"', content, flags=re.MULTILINE
-    )
-    content = re.sub(
-        r'^(id\s*=\s*)"([^"]+)"', r'\1"\2_dev"', content, flags=re.MULTILINE
-    )
-    with open(toml_path, "w", encoding="utf-8") as file:
-        file.write(content)
+    if os.path.basename(src) != "blender_manifest.toml":
+        return shutil.copy2(src, dst)
+
+    content = Path(src).read_text(encoding="utf-8")
+    Path(dst).write_text(_DEV_RE.sub(r'\1"\2_dev"', content), encoding="utf-8")
+    return dst
 
 
 def dev_build_setup(base_path: str | os.PathLike) -> str | os.PathLike:
@@ -119,8 +122,10 @@ def dev_build_setup(base_path: str | os.PathLike) -> str | os.PathLike:
         printcol("Orange", f"Removing old dev folder: {dev_folder}")
         shutil.rmtree(dev_folder)
 
-    # Creates _dev copy of extension folder
-    shutil.copytree(os.path.join(base_path, EXTENSION_FOLDER), dev_folder)
+    # Creates _dev copy of extension folder, renaming it on the fly
+    shutil.copytree(
+        os.path.join(base_path, EXTENSION_FOLDER), dev_folder, copy_function=devify_copy
+    )
 
     # Find and delete any existing _dev zip file
     dev_zip_files = glob.glob("*_dev.zip", root_dir=releases_dir) or []
@@ -130,8 +135,6 @@ def dev_build_setup(base_path: str | os.PathLike) -> str | os.PathLike:
         printcol("Orange", f"Removing old dev zip: {file_path}")
         os.remove(file_path)
 
-    devify_extension_name(dev_folder)
-
     return dev_folder
 
 
@@ -143,7 +146,7 @@ def read_version_toml(base_path: str | os.PathLike) -> tuple[int, int, int]:
 
     with open(toml_path, "r", encoding="utf-8") as file:
         content = file.read()
-    match = re.search(r'^version\s*=\s*"(\d+)\.(\d+)\.(\d+)"', content, re.MULTILINE)
+    match = _TOML_VER_RE.search(content)
     if match:
         return tuple(map(int, match.groups()))
     raise ValueError("Version not found in blender_manifest.toml")
@@ -158,16 +161,19 @@ def get_existing_versions(base_path: str | os.PathLike) -> list[tuple[int, int,
     if not os.path.exists(releases_dir):
         return []
 
-    version_pattern = re.compile(
-        rf"extension_{EXTENSION_FOLDER}_v(\d+)-(\d+)-(\d+)\.zip"
-    )
+    prefix = f"extension_{EXTENSION_FOLDER}_v"
     existing_versions = []
 
-    for filename in os.listdir(releases_dir):
-        match = version_pattern.match(filename)
-        if match:
-            version = tuple(map(int, match.groups()))
-            existing_versions.append(version)
+    with os.scandir(releases_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            # Cheap prefix/suffix test before running the regex
+            if not filename.startswith(prefix) or not filename.endswith(".zip"):
+                continue
+            match = _ZIP_VER_RE.match(filename)
+            if match:
+                version = tuple(map(int, match.groups()))
+                existing_versions.append(version)
 
     return sorted(existing_versions)
 
@@ -190,15 +196,21 @@ def update_version_in_toml(
 ) -> None:
     """Updates the version in blender_manifest.toml"""
 
-    version_str = f'version = "{version[0]}.{version[1]}.{version[2]}"'
+    version_str = f"{version[0]}.{version[1]}.{version[2]}"
     toml_path = os.path.join(base_path, EXTENSION_FOLDER, "blender_manifest.toml")
     with open(toml_path, "r", encoding="utf-8") as file:
-        content = file.read()
-    content = re.sub(
-        r'^version\s*=\s*"\d+\.\d+\.\d+"', version_str, content, flags=re.MULTILINE
-    )
+        lines = file.readlines()
+    # Rewrite the quoted value of the first `version =` line, keeping anything
+    # after it. Commented out lines don't match the key and are skipped.
+    for i, line in enumerate(lines):
+        key, _, value = line.partition("=")
+        if key.strip() == "version":
+            before, _, old_value = value.partition('"')
+            _, _, after = old_value.partition('"')
+            lines[i] = f'{key}={before}"{version_str}"{after}'
+            break
     with open(toml_path, "w", encoding="utf-8") as file:
-        file.write(content)
+        file.writelines(lines)
 
 
 def build_extention_zip(
@@ -212,18 +224,25 @@ def build_extention_zip(
     Use Blender's CLI to build the extension into the Releases folder.
     """
 
-    if not os.path.exists(f"{base_path}/Releases"):
-        os.mkdir(f"{base_path}/Releases")
+    releases_dir = os.path.join(base_path, "Releases")
+    if not os.path.exists(releases_dir):
+        os.mkdir(releases_dir)
 
     file_name = f"extension_{EXTENSION_FOLDER}_{version}.zip"
-    file_path = os.path.join(base_path, "Releases", file_name)
-    command = (
-        f"{PATH_TO_BLENDER} --factory-startup --command extension build "
-        f"--source-dir {source_folder} "
-        f"--output-filepath {file_path}"
-    )
+    file_path = os.path.join(releases_dir, file_name)
+    command = [
+        PATH_TO_BLENDER,
+        "--factory-startup",
+        "--command",
+        "extension",
+        "build",
+        "--source-dir",
+        os.path.join(base_path, source_folder),
+        "--output-filepath",
+        file_path,
+    ]
     printcol("Cyan", f"Building Extension: {file_name}")
-    printcol("LightYellow", command)
+    printcol("LightYellow", shlex.join(command))
 
     result = subprocess.run(
         command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=False
@@ -328,9 +347,8 @@ def install_extension(base_path: str | os.PathLike, version: str) -> None:
     zip_filename = f"extension_{EXTENSION_FOLDER}_{version}.zip"
 
     if version == "dev":
-        command = f"{PATH_TO_BLENDER} --command extension remove {module}_dev"
-    else:
-        command = f"{PATH_TO_BLENDER} --command extension remove {module}"
+        module += "_dev"
+    command = [PATH_TO_BLENDER, "--command", "extension", "remove", module]
 
     printcol("Cyan", f"Removing old extension: {zip_filename}")
 
@@ -356,12 +374,18 @@ def install_extension(base_path: str | os.PathLike, version: str) -> None:
     if not os.path.exists(zip_path):
         printcol("Red", f"Error: Zip file not found: {zip_path}", alert=True)
         return
-    command = (
-        f"{PATH_TO_BLENDER} --command extension install-file "
-        f"--repo user_default --enable {zip_path}"
-    )
+    command = [
+        PATH_TO_BLENDER,
+        "--command",
+        "extension",
+        "install-file",
+        "--repo",
+        "user_default",
+        "--enable",
+        zip_path,
+    ]
     printcol("Cyan", f"Installing extension: {zip_filename}")
-    printcol("LightYellow", command)
+    printcol("LightYellow", shlex.join(command))
     result = subprocess.run(
         command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
     )